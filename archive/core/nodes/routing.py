@@ -7,7 +7,7 @@ Smart routing to select the best agent for a task.
 
 import os
 import re
-import yaml
+from collections import deque
 from typing import Any, Dict, List, Optional, Tuple
 
 import sys
@@ -121,6 +121,7 @@ class AgentSelectorNode(Node):
         
         description = inputs["task_description"].lower()
         files = inputs["task_files"]
+        expertise_set = frozenset(inputs["expertise_domains"])
         
         # 1. Check for explicit override: [use:agent-name]
         override_match = re.search(r'\[use:([a-z-]+)\]', inputs["task_description"], re.IGNORECASE)
@@ -146,9 +147,17 @@ class AgentSelectorNode(Node):
         rules = self.default_rules.copy()
         
         if os.path.exists(inputs["routing_file"]):
+            # Deferred import: most flows never customize routing, so don't
+            # pay the yaml import cost at module load
+            import yaml
             try:
-                with open(inputs["routing_file"], 'r') as f:
-                    custom_rules = yaml.safe_load(f) or {}
+                # Prefer the libyaml C loader (5-10x faster for small docs)
+                from yaml import CSafeLoader as _YamlLoader
+            except ImportError:
+                from yaml import SafeLoader as _YamlLoader
+            try:
+                with open(inputs["routing_file"], 'rb') as f:
+                    custom_rules = yaml.load(f.read(), Loader=_YamlLoader) or {}
                     # Merge custom rules (custom takes precedence)
                     if "agents" in custom_rules:
                         rules["agents"].update(custom_rules["agents"])
@@ -158,47 +167,56 @@ class AgentSelectorNode(Node):
                 pass
         
         # 4. Score each agent (keyword-based fallback)
+        # Pre-filter to available agents (when specified) instead of
+        # re-checking membership on every iteration
         available = inputs["available_agents"]
-        
-        for agent_name, agent_rules in rules["agents"].items():
-            # Skip if not in available agents (when specified)
-            if available and agent_name not in available:
-                continue
-            
+        available_set = frozenset(available) if available else None
+        if available_set is None:
+            candidates = rules["agents"].items()
+        else:
+            candidates = (
+                (name, r) for name, r in rules["agents"].items()
+                if name in available_set
+            )
+
+        for agent_name, agent_rules in candidates:
             score = 0
-            matches = []
-            
+            # Only the last 3 matches ever reach the reason string, so keep
+            # (category, pattern) tuples in a bounded deque and format once
+            # after scoring instead of building an f-string per hit
+            match_trace = deque(maxlen=3)
+
             # Check file patterns
             file_patterns = agent_rules.get("file_patterns", [])
             for pattern in file_patterns:
                 for file_path in files:
                     if re.search(pattern, file_path, re.IGNORECASE):
                         score += 10
-                        matches.append(f"file:{pattern}")
-                
+                        match_trace.append(("file", pattern))
+
                 # Also check in description
                 if re.search(pattern, description, re.IGNORECASE):
                     score += 5
-                    matches.append(f"desc_file:{pattern}")
-            
+                    match_trace.append(("desc_file", pattern))
+
             # Check keywords
             keywords = agent_rules.get("keywords", [])
             for keyword in keywords:
                 if keyword.lower() in description:
                     score += 3
-                    matches.append(f"keyword:{keyword}")
-            
+                    match_trace.append(("keyword", keyword))
+
             # Check domains
             domains = agent_rules.get("domains", [])
             for domain in domains:
-                if domain in inputs["expertise_domains"]:
+                if domain in expertise_set:
                     score += 2
-                    matches.append(f"domain:{domain}")
+                    match_trace.append(("domain", domain))
                     result["detected_domains"].append(domain)
-            
+
             result["scores"][agent_name] = {
                 "score": score,
-                "matches": matches,
+                "matches": [f"{category}:{pattern}" for category, pattern in match_trace],
             }
         
         # 5. Select best agent from keyword scoring
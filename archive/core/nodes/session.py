@@ -8,27 +8,335 @@ Handles session lifecycle:
 """
 
 import os
-import json
+import re
+import mmap
 import time
+import functools
 import subprocess
+from collections import defaultdict
+from itertools import chain
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pocketflow import Node
+from store import selective_load
+from utils import get_git_status, jsonio
+
+
+# Files above this size are memory-mapped rather than read through a
+# buffered file object; below it, mmap setup overhead dominates
+_MMAP_THRESHOLD = 64 * 1024
+
+# progress.json files above this size are stream-parsed key-by-key
+_PROGRESS_STREAM_THRESHOLD = 1 << 20
+
+# The only top-level progress.json keys the session nodes consume
+_PROGRESS_KEYS = ("tasks", "current_task", "completed", "completed_tasks")
+
+
+def _safe_read_json(path: str) -> Optional[Any]:
+    """
+    Read and parse a small JSON file, returning None on any failure.
+
+    One code path for the missing-file / unreadable / unparseable cases
+    the session nodes all treat identically. Reads via a raw fd sized
+    from fstat — small state files don't need Python's buffered IO.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    try:
+        return jsonio.loads(data)
+    except ValueError:
+        return None
+
+
+def _load_progress(path) -> Optional[Dict[str, Any]]:
+    """
+    Load progress.json, projecting only the keys the nodes read.
+
+    Small files go through the fast JSON codec; files above
+    _PROGRESS_STREAM_THRESHOLD are stream-parsed with ijson (when
+    installed) so memory stays bounded no matter how much history the
+    file accumulates. Returns None on read/parse errors.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+
+    if size > _PROGRESS_STREAM_THRESHOLD:
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        if ijson is not None:
+            try:
+                progress = {}
+                with open(path, 'rb') as f:
+                    for key, value in ijson.kvitems(f, '', use_float=True):
+                        if key in _PROGRESS_KEYS:
+                            progress[key] = value
+                return progress
+            except (ijson.JSONError, ValueError, IOError):
+                return None
+
+    return _safe_read_json(path)
+
+
+def _refresh_progress_counts(progress):
+    """
+    Keep the persisted progress._counts ints in step with the arrays.
+
+    FileStore.save injects these for cheap status reads; any other
+    writer that re-persists progress must refresh them, or a resumed
+    session would carry the previous run's counts forward verbatim.
+    """
+    if isinstance(progress, dict):
+        progress["_counts"] = {
+            "completed": len(progress.get("completed", [])),
+            "tasks": len(progress.get("tasks", [])),
+        }
+    return progress
+
+
+@functools.lru_cache(maxsize=512)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Read a text file as UTF-8 (cached per (path, mtime_ns, size)).
+
+    mtime_ns and size are cache-key-only arguments: a rewrite of the file
+    changes the key and forces a fresh read, so resumes and checkpoints
+    within one process skip re-reading unchanged files.
+
+    Large files are memory-mapped so the OS pages in the content directly
+    without the extra buffered-IO copy; small files use a plain read.
+    """
+    if size > _MMAP_THRESHOLD:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return bytes(mm).decode('utf-8')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _read_text(path) -> str:
+    """Read a text file as UTF-8, reusing the cached copy when unchanged."""
+    st = os.stat(path)
+    return _read_text_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _read_files(entries: List[Tuple[str, str, bool]]) -> Dict[str, str]:
+    """
+    Read a batch of (key, path, record_errors) entries into a dict.
+
+    Batches of more than two files go through a small thread pool — the
+    GIL is released during read(), so many small-file reads overlap their
+    syscall latency instead of paying it serially. Failed reads either
+    record an error placeholder (markdown) or are dropped (yaml).
+    """
+    def read_one(entry):
+        key, path, record_errors = entry
+        try:
+            return key, _read_text(path)
+        except (IOError, UnicodeDecodeError):
+            if record_errors:
+                return key, f"[Error reading {os.path.basename(path)}]"
+            return key, None
+
+    if len(entries) <= 2:
+        results = [read_one(entry) for entry in entries]
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(entries))) as pool:
+            results = list(pool.map(read_one, entries))
+
+    return {key: content for key, content in results if content is not None}
+
+
+class _LazyFileMap(Mapping):
+    """
+    Dict-like view over a set of files that reads each one on first access.
+
+    Keys (filenames) are known up front from the directory scan, but file
+    content is only read — and cached — when a key is actually
+    subscripted, so files the downstream nodes never touch are never
+    opened. Unreadable files yield the same placeholder string the eager
+    loader used.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self._paths = paths  # key -> filesystem path
+        self._cache: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> str:
+        content = self._cache.get(key)
+        if content is None:
+            path = self._paths[key]
+            try:
+                content = _read_text(path)
+            except (IOError, UnicodeDecodeError):
+                content = f"[Error reading {os.path.basename(path)}]"
+            self._cache[key] = content
+        return content
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, key) -> bool:
+        return key in self._paths
+
+
+# Cache of git orientation output, stored alongside the session files
+_ORIENT_CACHE_NAME = ".git_orient_cache.json"
+
+# Compact the checkpoint delta log back into a full snapshot this often
+_CHECKPOINT_COMPACT_EVERY = 10
+
+
+def _git_orient_key(project_root: str) -> Optional[List]:
+    """
+    Build an orientation cache key from .git/HEAD and .git/index mtimes.
+
+    Returns None when the project has no readable .git/HEAD (not a git
+    repo, or a layout we don't understand) — callers then skip caching.
+    """
+    git_dir = os.path.join(project_root, ".git")
+    try:
+        head_mtime = os.stat(os.path.join(git_dir, "HEAD")).st_mtime_ns
+    except OSError:
+        return None
+    try:
+        index_mtime = os.stat(os.path.join(git_dir, "index")).st_mtime_ns
+    except OSError:
+        index_mtime = 0
+    return [project_root, head_mtime, index_mtime]
+
+
+def _atomic_write_json(path: str, obj: Any) -> None:
+    """
+    Write obj to path as compact JSON, atomically.
+
+    Serializes to a sibling temp file, fsyncs, then os.replace()s into
+    place, so a crash mid-write can never leave a truncated session or
+    progress file behind. Compact encoding (no indent) also roughly
+    halves the bytes written on the checkpoint hot path.
+    """
+    _atomic_write_text(path, jsonio.dumps(obj))
+
+
+def _atomic_write_text(path: str, data: str) -> None:
+    """Write pre-serialized text to path atomically (temp + fsync + rename)."""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data.encode('utf-8'))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def _join_fragments(fragments: Dict[str, str]) -> str:
+    """
+    Assemble a JSON object from already-serialized member values.
+
+    Lets a caller that has per-key fragments (e.g. for change detection)
+    build the full document without traversing the values a second time.
+    """
+    return "{%s}" % ",".join(
+        f"{jsonio.dumps(key)}:{value}" for key, value in fragments.items()
+    )
+
+
+# Task items: - [ ] 1.1 Description or - [x] Description (optional id captured)
+_TASK_RE = re.compile(
+    r'(?m)^[ \t]*[-*][ \t]*\[([ xX])\][ \t]*(?:(\d+\.?\d*)[ \t]+)?(.+?)[ \t]*$'
+)
+# Section headers: h2 (domain fallback), h3 (domain), h4 (task group)
+_HEADER_RE = re.compile(r'(?m)^(#{2,4})[ \t]+(.+?)[ \t]*$')
+
+# Domain to specialist mapping
+_DOMAIN_SPECIALIST_MAP = {
+    "database": "database-specialist",
+    "api": "api-specialist",
+    "frontend": "frontend-specialist",
+    "ui": "frontend-specialist",
+    "component": "frontend-specialist",
+    "testing": "implementer",
+    "integration": "implementer",
+    "test": "implementer",
+}
+
+# Keywords that make an h2 header look like a layer/domain header
+_H2_DOMAIN_KEYWORDS = ('layer', 'database', 'api', 'frontend', 'ui', 'testing', 'component')
+
+# Product files downstream context actually consumes; pass allowlist=None
+# to load_product_files to fall back to a full directory scan
+_DEFAULT_PRODUCT_FILES = ("mission.md", "roadmap.md", "tech-stack.md")
+
+# Shared status strings — one object each no matter how many tasks
+_STATUS_PENDING = sys.intern("pending")
+_STATUS_COMPLETED = sys.intern("completed")
+
+
+def _get_specialist_for_domain(domain: str) -> str:
+    """Map domain header to specialist agent."""
+    domain_lower = domain.lower()
+    for key, specialist in _DOMAIN_SPECIALIST_MAP.items():
+        if key in domain_lower:
+            return specialist
+    return "implementer"
+
+
+def _scan_dir(path) -> Tuple[List[str], List[str]]:
+    """
+    Walk a directory once with os.scandir and bucket files by suffix.
+
+    Returns (md_paths, yaml_paths). A single scandir pass replaces the
+    three Path.glob calls (*.md, *.yaml, *.yml) that each re-listed the
+    directory; is_file(follow_symlinks=False) avoids per-entry stat calls
+    where the OS provides d_type.
+    """
+    md_paths = []
+    yaml_paths = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                suffix = entry.name.rpartition('.')[2].lower()
+                if suffix == 'md':
+                    md_paths.append(entry.path)
+                elif suffix in ('yaml', 'yml'):
+                    yaml_paths.append(entry.path)
+    except OSError:
+        pass
+    return md_paths, yaml_paths
 
 
 def parse_tasks_from_markdown(tasks_content: str) -> List[Dict[str, Any]]:
     """
     Parse tasks from tasks.md content.
-    
+
     Extracts task items in formats like:
     - [ ] 1.1 Task description
     - [x] 1.2 Completed task
     - [ ] Task without number
-    
+
     Returns list of task objects with:
     - id: Task identifier (e.g., "1.1" or generated)
     - description: Task text
@@ -37,130 +345,113 @@ def parse_tasks_from_markdown(tasks_content: str) -> List[Dict[str, Any]]:
     - group: Task group name
     - specialist: Suggested specialist agent based on domain
     """
-    import re
-    
+    # Callers may mutate the task dicts, so hand out shallow copies of
+    # the cached parse (values are all immutable strings)
+    return [dict(task) for task in _parse_tasks_cached(tasks_content)]
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_tasks_cached(tasks_content: str) -> tuple:
+    """Parse tasks.md content once per unique buffer (see wrapper above)."""
     tasks = []
     current_domain = "default"
     current_group = None
     current_specialist = "implementer"
-    
-    # Domain to specialist mapping
-    domain_specialist_map = {
-        "database": "database-specialist",
-        "api": "api-specialist",
-        "frontend": "frontend-specialist",
-        "ui": "frontend-specialist",
-        "component": "frontend-specialist",
-        "testing": "implementer",
-        "integration": "implementer",
-        "test": "implementer",
-    }
-    
-    def get_specialist_for_domain(domain: str) -> str:
-        """Map domain header to specialist agent."""
-        domain_lower = domain.lower()
-        for key, specialist in domain_specialist_map.items():
-            if key in domain_lower:
-                return specialist
-        return "implementer"
-    
-    lines = tasks_content.split('\n')
-    
-    for line in lines:
-        # Track domain/layer headers (h3): ### Database Layer, ### API Layer, etc.
-        if line.startswith('### ') and not line.startswith('#### '):
-            header = line[4:].strip()
-            # Skip if it's a "Task Group" header at h3 level (shouldn't happen but be safe)
-            if 'Task Group' not in header:
-                current_domain = header
-                current_specialist = get_specialist_for_domain(header)
-        
-        # Track task group headers (h4): #### Task Group 1: Description
-        elif line.startswith('#### '):
-            header = line[5:].strip()
-            if 'Task Group' in header:
-                current_group = header
-        
-        # Fallback: h2 headers as domain (## Database Layer)
-        elif line.startswith('## ') and not line.startswith('### '):
-            header = line[3:].strip()
-            # Only treat as domain if it looks like a layer name
-            if any(kw in header.lower() for kw in ['layer', 'database', 'api', 'frontend', 'ui', 'testing', 'component']):
-                current_domain = header
-                current_specialist = get_specialist_for_domain(header)
-        
-        # Parse task items
-        # Match patterns like: - [ ] 1.1 Description or - [x] Description
-        task_match = re.match(r'^[-*]\s*\[([ xX])\]\s*(.+)$', line.strip())
-        if task_match:
-            checkbox = task_match.group(1)
-            task_text = task_match.group(2).strip()
-            
-            # Try to extract task ID (e.g., "1.1", "2.3")
-            id_match = re.match(r'^(\d+\.?\d*)\s+(.+)$', task_text)
-            if id_match:
-                task_id = id_match.group(1)
-                description = id_match.group(2)
-            else:
-                # Generate ID from description
-                task_id = task_text[:20].replace(' ', '_').lower()
-                description = task_text
-            
-            task = {
-                "id": task_id,
-                "description": description,
-                "full_text": task_text,
-                "status": "completed" if checkbox.lower() == 'x' else "pending",
-                "domain": current_domain,
-                "group": current_group,
-                "specialist": current_specialist,
-            }
-            tasks.append(task)
-    
-    return tasks
 
+    # Two finditer scans over the whole buffer (no per-line matching):
+    # headers and tasks both come back in document order, so a merge-walk
+    # applies each header's state before the tasks that follow it.
+    headers = _HEADER_RE.finditer(tasks_content)
+    next_header = next(headers, None)
+
+    for task_match in _TASK_RE.finditer(tasks_content):
+        # Apply all headers that appear before this task
+        while next_header is not None and next_header.start() < task_match.start():
+            level = len(next_header.group(1))
+            header = next_header.group(2)
+
+            if level == 3:
+                # Domain/layer headers (h3): ### Database Layer, ### API Layer
+                # Skip if it's a "Task Group" header at h3 level (shouldn't happen but be safe)
+                if 'Task Group' not in header:
+                    current_domain = sys.intern(header)
+                    current_specialist = _get_specialist_for_domain(header)
+            elif level == 4:
+                # Task group headers (h4): #### Task Group 1: Description
+                if 'Task Group' in header:
+                    current_group = sys.intern(header)
+            elif level == 2:
+                # Fallback: h2 headers as domain (## Database Layer)
+                # Only treat as domain if it looks like a layer name
+                if any(kw in header.lower() for kw in _H2_DOMAIN_KEYWORDS):
+                    current_domain = sys.intern(header)
+                    current_specialist = _get_specialist_for_domain(header)
 
-def load_product_files(project_root: str) -> Dict[str, str]:
+            next_header = next(headers, None)
+
+        checkbox, task_id, description = task_match.groups()
+        if not task_id:
+            # Generate ID from description
+            task_id = description[:20].replace(' ', '_').lower()
+
+        task = {
+            "id": task_id,
+            "description": description,
+            "status": _STATUS_COMPLETED if checkbox in 'xX' else _STATUS_PENDING,
+            "domain": current_domain,
+            "group": current_group,
+            "specialist": current_specialist,
+        }
+        tasks.append(task)
+
+    return tuple(tasks)
+
+
+def load_product_files(
+    project_root: str,
+    allowlist: Optional[tuple] = _DEFAULT_PRODUCT_FILES,
+) -> Dict[str, str]:
     """
     Load product context files from agent-os/product/.
-    
+
     These files provide broader product context:
     - mission.md: Product mission, purpose, target users
     - roadmap.md: Features completed, current state, where new features fit
     - tech-stack.md: Technologies, frameworks, constraints
-    - Any other .md files in the product folder
-    
+
+    By default only the allowlisted files are read — no directory scan,
+    no reads of files downstream never uses. Pass allowlist=None to scan
+    and load every .md/.yaml/.yml in the product folder.
+
     Returns dict with filename -> content mapping.
     """
-    product_dir = Path(project_root) / "agent-os" / "product"
+    product_dir = os.path.join(project_root, "agent-os", "product")
     result = {}
-    
-    if not product_dir.exists():
-        return result
-    
-    # Load all markdown files in product folder
-    for md_file in product_dir.glob("*.md"):
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                result[md_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            result[md_file.name] = f"[Error reading {md_file.name}]"
-    
-    # Also load any yaml/yml files
-    for yaml_file in product_dir.glob("*.yaml"):
-        try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                result[yaml_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            pass
-    
-    for yml_file in product_dir.glob("*.yml"):
+
+    if allowlist is not None:
+        # One scandir pass replaces a stat probe per allowlisted name
+        # (and the isdir probe — a missing folder raises here)
         try:
-            with open(yml_file, 'r', encoding='utf-8') as f:
-                result[yml_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            pass
-    
+            with os.scandir(product_dir) as dir_entries:
+                present = {e.name for e in dir_entries}
+        except OSError:
+            return result
+        entries = [
+            (name, os.path.join(product_dir, name), True)
+            for name in allowlist
+            if name in present
+        ]
+        result.update(_read_files(entries))
+        return result
+
+    # Full scan: one directory walk picks up markdown and yaml/yml files
+    # together, read as one batch through the pool
+    md_paths, yaml_paths = _scan_dir(product_dir)
+
+    entries = [(os.path.basename(p), p, True) for p in md_paths]
+    entries.extend((os.path.basename(p), p, False) for p in yaml_paths)
+    result.update(_read_files(entries))
+
     return result
 
 
@@ -176,7 +467,7 @@ def load_spec_files(spec_path: str) -> Dict[str, Any]:
     - progress.json
     
     Returns dict with:
-    - files: Dict[filename, content] for text files
+    - files: Mapping[filename, content] for text files (read lazily on access)
     - visuals: List of visual file paths
     - progress: Dict from progress.json
     """
@@ -186,62 +477,51 @@ def load_spec_files(spec_path: str) -> Dict[str, Any]:
         "progress": None,
         "spec_path": spec_path,
     }
-    
-    if not os.path.exists(spec_path):
-        return result
-    
-    spec_dir = Path(spec_path)
-    
-    # Load all markdown files in spec root
-    for md_file in spec_dir.glob("*.md"):
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                result["files"][md_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            result["files"][md_file.name] = f"[Error reading {md_file.name}]"
-    
-    # Load progress.json
-    progress_file = spec_dir / "progress.json"
-    if progress_file.exists():
-        try:
-            with open(progress_file, 'r') as f:
-                result["progress"] = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    
+
+    # No exists() probe on spec_path — _scan_dir returns empty lists for
+    # a missing directory and everything below degrades the same way
+
+    # Single directory walk picks up markdown and yaml/yml files together
+    md_paths, yaml_paths = _scan_dir(spec_path)
+
+    # Collect every (key, path, record_errors) pair up front, then read
+    # them as one batch so small-file IO latency overlaps in the pool
+
+    # Markdown files in spec root
+    file_entries = [
+        (os.path.basename(md_path), md_path, True) for md_path in md_paths
+    ]
+
+    # Any yaml/yml config files
+    file_entries.extend(
+        (os.path.basename(yaml_path), yaml_path, False) for yaml_path in yaml_paths
+    )
+
+    # Load progress.json (its own stat doubles as the existence check)
+    result["progress"] = _load_progress(os.path.join(spec_path, "progress.json"))
+
     # Load planning folder if exists
-    planning_dir = spec_dir / "planning"
-    if planning_dir.exists() and planning_dir.is_dir():
-        # Load planning markdown files
-        for md_file in planning_dir.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    result["files"][f"planning/{md_file.name}"] = f.read()
-            except (IOError, UnicodeDecodeError):
-                result["files"][f"planning/{md_file.name}"] = f"[Error reading {md_file.name}]"
+    planning_dir = os.path.join(spec_path, "planning")
+    if os.path.isdir(planning_dir):
+        # Planning markdown files
+        planning_md, _ = _scan_dir(planning_dir)
+        file_entries.extend(
+            (f"planning/{os.path.basename(md_path)}", md_path, True)
+            for md_path in planning_md
+        )
         
         # Collect visual file paths (don't load binary content)
-        visuals_dir = planning_dir / "visuals"
-        if visuals_dir.exists() and visuals_dir.is_dir():
-            for visual_file in visuals_dir.iterdir():
-                if visual_file.is_file():
-                    result["visuals"].append(str(visual_file.relative_to(spec_dir)))
-    
-    # Load any yaml/yml config files
-    for yaml_file in spec_dir.glob("*.yaml"):
-        try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                result["files"][yaml_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            pass
-    
-    for yml_file in spec_dir.glob("*.yml"):
-        try:
-            with open(yml_file, 'r', encoding='utf-8') as f:
-                result["files"][yml_file.name] = f.read()
-        except (IOError, UnicodeDecodeError):
-            pass
+        visuals_dir = os.path.join(planning_dir, "visuals")
+        if os.path.isdir(visuals_dir):
+            with os.scandir(visuals_dir) as visual_entries:
+                for entry in visual_entries:
+                    if entry.is_file(follow_symlinks=False):
+                        result["visuals"].append(os.path.relpath(entry.path, spec_path))
     
+    # Contents load lazily: only the files downstream nodes actually
+    # subscript (typically spec.md and tasks.md) get opened
+    result["files"] = _LazyFileMap({key: path for key, path, _ in file_entries})
+
     return result
 
 
@@ -268,27 +548,42 @@ class SessionStartNode(Node):
     - spec_visuals: List of visual file paths
     """
     
-    def __init__(self, sessions_dir: str = "agent-os/sessions", **kwargs):
+    def __init__(
+        self,
+        sessions_dir: str = "agent-os/sessions",
+        product_files: Optional[tuple] = _DEFAULT_PRODUCT_FILES,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.sessions_dir = sessions_dir
-    
+        # Allowlist of product files to load (None = scan the whole folder)
+        self.product_files = product_files
+        # project_root -> joined sessions path, so looping flows don't
+        # re-join the same strings on every prep
+        self._sessions_path_cache: Dict[str, str] = {}
+
     def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """Gather session initialization context."""
         project_root = shared.get("project_root", os.getcwd())
         spec_name = shared.get("spec_name")
         session_id = shared.get("session_id") or f"session_{int(time.time())}"
-        
+
         # Build spec path
         spec_path = None
         if spec_name:
             spec_path = os.path.join(project_root, "agent-os/specs", spec_name)
-        
+
+        sessions_path = self._sessions_path_cache.get(project_root)
+        if sessions_path is None:
+            sessions_path = os.path.join(project_root, self.sessions_dir)
+            self._sessions_path_cache[project_root] = sessions_path
+
         return {
             "project_root": project_root,
             "spec_name": spec_name,
             "spec_path": spec_path,
             "session_id": session_id,
-            "sessions_path": os.path.join(project_root, self.sessions_dir),
+            "sessions_path": sessions_path,
         }
     
     def exec(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
@@ -314,41 +609,97 @@ class SessionStartNode(Node):
         # 1. Orient: Get current working directory
         result["orientation"]["cwd"] = project_root
         
-        # 2. Orient: Git status (if git repo)
-        try:
-            git_status = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            result["orientation"]["git_status"] = git_status.stdout.strip()
-            
-            # Recent commits
-            git_log = subprocess.run(
-                ["git", "log", "--oneline", "-5"],
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            result["orientation"]["recent_commits"] = git_log.stdout.strip().split("\n")
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            result["orientation"]["git_status"] = None
-            result["orientation"]["recent_commits"] = []
-        
+        # 2. Orient: Git status + recent commits (if git repo)
+        # Check the orientation cache first — if .git/HEAD and .git/index
+        # are untouched since the last run, skip both subprocess forks
+        orient_key = _git_orient_key(project_root)
+        cache_path = os.path.join(inputs["sessions_path"], _ORIENT_CACHE_NAME)
+        cache_hit = False
+        if orient_key is not None:
+            cached = _safe_read_json(cache_path)
+            if cached and cached.get("key") == orient_key:
+                result["orientation"]["git_status"] = cached.get("git_status")
+                result["orientation"]["recent_commits"] = cached.get("recent_commits", [])
+                cache_hit = True
+
+        if not cache_hit:
+            # The commands are independent, so start both before collecting
+            # either — wall-clock cost is the slower of the two, not the sum.
+            # --no-optional-locks skips the index-lock write and
+            # --no-ahead-behind the upstream distance computation; neither
+            # affects porcelain output
+            procs = []
+            try:
+                git_status = subprocess.Popen(
+                    ["git", "--no-optional-locks", "status", "--porcelain", "--no-ahead-behind"],
+                    cwd=project_root,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                procs.append(git_status)
+                git_log = subprocess.Popen(
+                    ["git", "log", "--oneline", "-5"],
+                    cwd=project_root,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+                procs.append(git_log)
+                status_out, _ = git_status.communicate(timeout=10)
+                log_out, _ = git_log.communicate(timeout=10)
+                result["orientation"]["git_status"] = status_out.strip()
+                result["orientation"]["recent_commits"] = log_out.strip().split("\n")
+
+                # Refresh the cache for the next session start
+                if orient_key is not None:
+                    try:
+                        os.makedirs(inputs["sessions_path"], exist_ok=True)
+                        _atomic_write_json(cache_path, {
+                            "key": orient_key,
+                            "git_status": result["orientation"]["git_status"],
+                            "recent_commits": result["orientation"]["recent_commits"],
+                        })
+                    except IOError:
+                        pass  # Cache write failure shouldn't block orientation
+            except (subprocess.TimeoutExpired, FileNotFoundError):
+                for proc in procs:
+                    proc.kill()
+                result["orientation"]["git_status"] = None
+                result["orientation"]["recent_commits"] = []
+
         # 3. Load previous session state
         session_file = os.path.join(
             inputs["sessions_path"], 
             f"{inputs['session_id']}.json"
         )
-        if os.path.exists(session_file):
+        # selective_load returns None when the file is absent, so no
+        # stat-before-open — one syscall, no TOCTOU window
+        # Resume only needs these sections — a large expertise tree
+        # in the file is skipped by the streaming parse
+        previous_state = selective_load(
+            session_file, ("session", "progress", "learnings", "ended_at")
+        )
+        if previous_state is not None:
+            result["previous_state"] = previous_state
+            result["resumed"] = True
+
+        # Fold in any checkpoint deltas appended since the last full
+        # snapshot (see CheckpointNode)
+        if result["previous_state"] is not None:
+            deltas_file = os.path.join(
+                inputs["sessions_path"],
+                f"{inputs['session_id']}.deltas.jsonl"
+            )
             try:
-                with open(session_file, 'r') as f:
-                    result["previous_state"] = json.load(f)
-                    result["resumed"] = True
-            except (json.JSONDecodeError, IOError):
+                with open(deltas_file, 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            result["previous_state"].update(jsonio.loads(line))
+            except FileNotFoundError:
+                pass
+            except (ValueError, IOError):
                 pass
         
         # 4. Load ALL spec files (not just progress.json)
@@ -364,7 +715,9 @@ class SessionStartNode(Node):
                 result["parsed_tasks"] = parsed_tasks
         
         # 5. Load product context files (mission.md, roadmap.md, tech-stack.md, etc.)
-        result["product_files"] = load_product_files(inputs["project_root"])
+        result["product_files"] = load_product_files(
+            inputs["project_root"], allowlist=self.product_files
+        )
         
         return result
     
@@ -422,20 +775,26 @@ class SessionStartNode(Node):
         # Merge parsed tasks into progress
         if exec_res.get("parsed_tasks"):
             parsed = exec_res["parsed_tasks"]
-            # Get pending tasks only (not already completed in tasks.md)
-            pending_tasks = [t for t in parsed if t["status"] == "pending"]
-            completed_from_md = [t["id"] for t in parsed if t["status"] == "completed"]
-            
+            # Split pending tasks from completed ids in one pass
+            pending_tasks = []
+            completed_from_md = []
+            for t in parsed:
+                if t["status"] == "pending":
+                    pending_tasks.append(t)
+                else:
+                    completed_from_md.append(t["id"])
+
             # Set tasks list from parsed tasks
             shared["progress"]["tasks"] = pending_tasks
-            
-            # Merge completed tasks (from progress.json and tasks.md)
-            existing_completed = set(shared["progress"].get("completed", []))
-            existing_completed.update(completed_from_md)
-            # Also check completed_tasks field (alternative format)
-            if shared["progress"].get("completed_tasks"):
-                existing_completed.update(shared["progress"]["completed_tasks"])
-            shared["progress"]["completed"] = list(existing_completed)
+
+            # Merge completed tasks (progress.json, tasks.md, and the
+            # alternative completed_tasks field), deduplicated in one
+            # hashed pass with insertion order preserved
+            shared["progress"]["completed"] = list(dict.fromkeys(chain(
+                shared["progress"].get("completed", []),
+                completed_from_md,
+                shared["progress"].get("completed_tasks") or [],
+            )))
             
             # Log task stats
             print(f"   Parsed {len(parsed)} tasks: {len(pending_tasks)} pending, {len(completed_from_md)} completed")
@@ -468,23 +827,30 @@ class SessionEndNode(Node):
     def __init__(self, sessions_dir: str = "agent-os/sessions", **kwargs):
         super().__init__(**kwargs)
         self.sessions_dir = sessions_dir
-    
+        self._sessions_path_cache: Dict[str, str] = {}
+
     def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """Gather state to persist."""
         session = shared.get("session", {})
         project_root = session.get("project_root", os.getcwd())
-        
+
+        sessions_path = self._sessions_path_cache.get(project_root)
+        if sessions_path is None:
+            sessions_path = os.path.join(project_root, self.sessions_dir)
+            self._sessions_path_cache[project_root] = sessions_path
+
         return {
             "session_id": session.get("id", f"session_{int(time.time())}"),
             "project_root": project_root,
-            "sessions_path": os.path.join(project_root, self.sessions_dir),
+            "sessions_path": sessions_path,
             "state_to_save": {
                 "session": session,
-                "progress": shared.get("progress", {}),
+                "progress": _refresh_progress_counts(shared.get("progress", {})),
                 "learnings": shared.get("learnings", []),
                 "ended_at": datetime.now().isoformat(),
             },
             "auto_commit": shared.get("auto_commit", False),
+            "last_checkpoint_hash": shared.get("last_checkpoint_hash"),
             "spec_name": session.get("spec_name"),
             "delegation_history": shared.get("delegation_history", []),
             "delegation_mode": shared.get("delegation_mode", "print"),
@@ -506,15 +872,64 @@ class SessionEndNode(Node):
             inputs["sessions_path"],
             f"{inputs['session_id']}.json"
         )
+        # Serialize each section once; the progress fragment is reused
+        # for the spec progress.json instead of re-encoding the object
         try:
-            with open(session_file, 'w') as f:
-                json.dump(inputs["state_to_save"], f, indent=2)
-            result["saved"] = True
-        except IOError as e:
-            result["save_error"] = str(e)
-        
+            fragments = {
+                k: jsonio.dumps(v) for k, v in inputs["state_to_save"].items()
+            }
+        except (TypeError, ValueError):
+            fragments = None
+
+        # When the last checkpoint already persisted identical
+        # session/progress/learnings, skip the full rewrite and append
+        # only the ended_at record to the delta log — SessionStartNode
+        # folds it back in on resume
+        state_hash = None
+        if fragments is not None:
+            state_hash = hash((
+                fragments.get("session"),
+                fragments.get("progress"),
+                fragments.get("learnings"),
+            ))
+
+        if state_hash is not None and state_hash == inputs["last_checkpoint_hash"]:
+            try:
+                line = jsonio.dumps(
+                    {"ended_at": inputs["state_to_save"]["ended_at"]}
+                ).encode('utf-8') + b"\n"
+                fd = os.open(
+                    f"{session_file[:-5]}.deltas.jsonl",
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                    0o644,
+                )
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                result["saved"] = True
+            except IOError as e:
+                result["save_error"] = str(e)
+            # progress.json is also already current from the checkpoint
+            write_progress = False
+        else:
+            try:
+                if fragments is not None:
+                    _atomic_write_text(session_file, _join_fragments(fragments))
+                else:
+                    _atomic_write_json(session_file, inputs["state_to_save"])
+                result["saved"] = True
+                # Full state persisted — any checkpoint delta log is stale now
+                try:
+                    os.remove(f"{session_file[:-5]}.deltas.jsonl")
+                except OSError:
+                    pass
+            except IOError as e:
+                result["save_error"] = str(e)
+            write_progress = True
+
         # Save progress.json back to spec
-        if inputs["spec_name"]:
+        if inputs["spec_name"] and write_progress:
             progress_path = os.path.join(
                 inputs["project_root"],
                 "agent-os/specs",
@@ -523,25 +938,45 @@ class SessionEndNode(Node):
             )
             try:
                 os.makedirs(os.path.dirname(progress_path), exist_ok=True)
-                with open(progress_path, 'w') as f:
-                    json.dump(inputs["state_to_save"]["progress"], f, indent=2)
+                if fragments is not None:
+                    _atomic_write_text(progress_path, fragments["progress"])
+                else:
+                    _atomic_write_json(progress_path, inputs["state_to_save"]["progress"])
             except IOError:
                 pass
         
-        # Auto-commit if configured
+        # Auto-commit if configured. The memoized status poll decides the
+        # cheapest path: clean tree → no subprocess at all; only tracked
+        # changes → a single commit -am; untracked present → add + commit
         if inputs["auto_commit"]:
+            message = f"Session {inputs['session_id']} checkpoint"
+            status = get_git_status(cwd=inputs["project_root"])
+            has_untracked = status is None or any(
+                line.startswith("??") for line in status.splitlines()
+            )
             try:
-                subprocess.run(
-                    ["git", "add", "-A"],
-                    cwd=inputs["project_root"],
-                    timeout=30
-                )
-                subprocess.run(
-                    ["git", "commit", "-m", f"Session {inputs['session_id']} checkpoint"],
-                    cwd=inputs["project_root"],
-                    timeout=30
-                )
-                result["committed"] = True
+                if status == "":
+                    pass  # Nothing to commit
+                elif not has_untracked:
+                    subprocess.run(
+                        ["git", "commit", "-am", message,
+                         "--no-verify", "--no-gpg-sign"],
+                        cwd=inputs["project_root"],
+                        timeout=30
+                    )
+                    result["committed"] = True
+                else:
+                    subprocess.run(
+                        ["git", "add", "-A"],
+                        cwd=inputs["project_root"],
+                        timeout=30
+                    )
+                    subprocess.run(
+                        ["git", "commit", "-m", message],
+                        cwd=inputs["project_root"],
+                        timeout=30
+                    )
+                    result["committed"] = True
             except (subprocess.TimeoutExpired, FileNotFoundError):
                 pass
         
@@ -555,7 +990,9 @@ class SessionEndNode(Node):
     def post(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> Optional[str]:
         """Store summary and return."""
         shared["session_summary"] = exec_res["summary"]
-        shared["session"]["ended_at"] = datetime.now().isoformat()
+        # Reuse the timestamp captured in prep — it's the one persisted
+        # in the session file
+        shared["session"]["ended_at"] = prep_res["state_to_save"]["ended_at"]
         
         # Print batch summary if we have delegation history
         delegation_history = prep_res.get("delegation_history", [])
@@ -567,13 +1004,10 @@ class SessionEndNode(Node):
             print("=" * 70)
             print(f"\n✅ Generated {len(delegation_history)} delegation(s):\n")
             
-            # Group by agent
-            by_agent = {}
+            # Group by agent in a single pass
+            by_agent = defaultdict(list)
             for d in delegation_history:
-                agent = d.get("agent", "unknown")
-                if agent not in by_agent:
-                    by_agent[agent] = []
-                by_agent[agent].append(d)
+                by_agent[d.get("agent", "unknown")].append(d)
             
             for agent, delegations in by_agent.items():
                 print(f"\n🤖 {agent}:")
@@ -605,22 +1039,45 @@ Each specialist agent has domain-specific expertise for optimal results.
 class CheckpointNode(Node):
     """
     Mid-session checkpoint - persist current state without ending session.
-    
+
     Use this between major operations to enable recovery.
-    
+
+    Instead of rewriting the full session file on every call, changed
+    state sections are appended to {session_id}.deltas.jsonl; every
+    _CHECKPOINT_COMPACT_EVERY deltas the log is compacted back into a
+    full snapshot. SessionStartNode replays the delta log on resume.
+
     Shared Store Inputs:
     - session: Session metadata
     - progress: Current progress
     - Any other state to checkpoint
-    
+
     Shared Store Outputs:
     - last_checkpoint: Timestamp of checkpoint
     """
-    
+
     def __init__(self, sessions_dir: str = "agent-os/sessions", **kwargs):
         super().__init__(**kwargs)
         self.sessions_dir = sessions_dir
-    
+        # Serialized top-level sections of the last checkpoint, used to
+        # skip no-op checkpoints and to compute deltas
+        self._last_key_dumps: Optional[Dict[str, str]] = None
+        self._delta_count = 0
+        self._sessions_path_cache: Dict[str, str] = {}
+        # Delta-log fd kept open across checkpoints — appends then cost
+        # one write syscall instead of path walk + open + close each time
+        self._delta_fd: Optional[int] = None
+        self._delta_fd_path: Optional[str] = None
+
+    def _close_delta_fd(self) -> None:
+        if self._delta_fd is not None:
+            try:
+                os.close(self._delta_fd)
+            except OSError:
+                pass
+            self._delta_fd = None
+            self._delta_fd_path = None
+
     def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """Gather state for checkpoint."""
         session = shared.get("session", {})
@@ -629,15 +1086,20 @@ class CheckpointNode(Node):
         # Collect all relevant state
         checkpoint_state = {
             "session": session,
-            "progress": shared.get("progress", {}),
+            "progress": _refresh_progress_counts(shared.get("progress", {})),
             "learnings": shared.get("learnings", []),
             "expertise": shared.get("expertise", {}),
             "checkpoint_at": datetime.now().isoformat(),
         }
         
+        sessions_path = self._sessions_path_cache.get(project_root)
+        if sessions_path is None:
+            sessions_path = os.path.join(project_root, self.sessions_dir)
+            self._sessions_path_cache[project_root] = sessions_path
+
         return {
             "session_id": session.get("id", "unknown"),
-            "sessions_path": os.path.join(project_root, self.sessions_dir),
+            "sessions_path": sessions_path,
             "checkpoint_state": checkpoint_state,
             "spec_name": session.get("spec_name"),
             "project_root": project_root,
@@ -646,23 +1108,107 @@ class CheckpointNode(Node):
     def exec(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Write checkpoint to disk."""
         result = {"success": False, "checkpoint_at": inputs["checkpoint_state"]["checkpoint_at"]}
-        
+
+        # Serialize each top-level section once — the fragments drive the
+        # unchanged-skip, the delta computation, and the full snapshot
+        prev_key_dumps = self._last_key_dumps
+        try:
+            key_dumps = {
+                k: jsonio.dumps(v)
+                for k, v in inputs["checkpoint_state"].items()
+                if k != "checkpoint_at"
+            }
+        except (TypeError, ValueError):
+            key_dumps = None
+
+        # Hash of the sections SessionEndNode also saves, published via
+        # post so it can skip its own rewrite when nothing changed since
+        if key_dumps is not None:
+            result["state_hash"] = hash((
+                key_dumps.get("session"),
+                key_dumps.get("progress"),
+                key_dumps.get("learnings"),
+            ))
+
+        # Skip the write entirely when nothing changed since the last
+        # checkpoint (comparison excludes the always-changing timestamp)
+        if key_dumps is not None and key_dumps == prev_key_dumps:
+            result["success"] = True
+            result["skipped"] = True
+            return result
+
         os.makedirs(inputs["sessions_path"], exist_ok=True)
-        
-        # Save to session file
+
         session_file = os.path.join(
             inputs["sessions_path"],
             f"{inputs['session_id']}.json"
         )
+        deltas_file = os.path.join(
+            inputs["sessions_path"],
+            f"{inputs['session_id']}.deltas.jsonl"
+        )
+
+        # Full snapshot on the first checkpoint, when state didn't
+        # serialize per-key, and periodically to compact the delta log
+        write_full = (
+            key_dumps is None
+            or prev_key_dumps is None
+            or self._delta_count >= _CHECKPOINT_COMPACT_EVERY
+        )
+
         try:
-            with open(session_file, 'w') as f:
-                json.dump(inputs["checkpoint_state"], f, indent=2)
+            if write_full:
+                if key_dumps is not None:
+                    # Reuse the per-key fragments — the state was already
+                    # serialized above for change detection
+                    _atomic_write_text(session_file, _join_fragments(
+                        dict(key_dumps, checkpoint_at=jsonio.dumps(result["checkpoint_at"]))
+                    ))
+                else:
+                    _atomic_write_json(session_file, inputs["checkpoint_state"])
+                # Snapshot now holds everything — drop the delta log and
+                # the fd pointing at its (now unlinked) inode
+                self._close_delta_fd()
+                try:
+                    os.remove(deltas_file)
+                except OSError:
+                    pass
+                self._delta_count = 0
+            else:
+                # Append only the sections that changed since last time
+                delta = {
+                    k: inputs["checkpoint_state"][k]
+                    for k in key_dumps
+                    if key_dumps[k] != prev_key_dumps.get(k)
+                }
+                delta["checkpoint_at"] = result["checkpoint_at"]
+                line = jsonio.dumps(delta).encode('utf-8') + b"\n"
+                if self._delta_fd is None or self._delta_fd_path != deltas_file:
+                    self._close_delta_fd()
+                    self._delta_fd = os.open(
+                        deltas_file,
+                        os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                        0o644,
+                    )
+                    self._delta_fd_path = deltas_file
+                try:
+                    os.write(self._delta_fd, line)
+                except OSError:
+                    self._close_delta_fd()
+                    raise
+                self._delta_count += 1
             result["success"] = True
+            self._last_key_dumps = key_dumps
         except IOError as e:
             result["error"] = str(e)
-        
-        # Also update progress.json in spec
-        if inputs["spec_name"]:
+
+        # Also update progress.json in spec, when it actually changed
+        progress_changed = (
+            key_dumps is None
+            or prev_key_dumps is None
+            or key_dumps.get("progress") != prev_key_dumps.get("progress")
+        )
+        if inputs["spec_name"] and progress_changed:
             progress_path = os.path.join(
                 inputs["project_root"],
                 "agent-os/specs",
@@ -670,17 +1216,22 @@ class CheckpointNode(Node):
                 "progress.json"
             )
             try:
-                with open(progress_path, 'w') as f:
-                    json.dump(inputs["checkpoint_state"]["progress"], f, indent=2)
+                if key_dumps is not None:
+                    # progress was already encoded into a fragment above
+                    _atomic_write_text(progress_path, key_dumps["progress"])
+                else:
+                    _atomic_write_json(progress_path, inputs["checkpoint_state"]["progress"])
             except IOError:
                 pass
-        
+
         return result
     
     def post(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> Optional[str]:
         """Update shared with checkpoint timestamp."""
         shared["last_checkpoint"] = exec_res["checkpoint_at"]
-        
+        if exec_res["success"] and "state_hash" in exec_res:
+            shared["last_checkpoint_hash"] = exec_res["state_hash"]
+
         if exec_res["success"]:
             return "checkpointed"
         return "error"
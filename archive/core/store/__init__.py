@@ -4,10 +4,11 @@ Store - Persistence utilities for Agent OS
 Provides file-based persistence for shared store state.
 """
 
-from .file_store import FileStore, load_shared, save_shared
+from .file_store import FileStore, load_shared, save_shared, selective_load
 
 __all__ = [
     'FileStore',
     'load_shared',
     'save_shared',
+    'selective_load',
 ]
@@ -6,10 +6,97 @@ the PocketFlow shared store to/from JSON files.
 """
 
 import os
-import json
+import time
+import heapq
+import shutil
+import hashlib
+import logging
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import jsonio
+
+try:
+    # Optional: session JSON compresses 5-10x at zstd level 3, which
+    # runs fast enough that the write path stays encoding-bound
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+# Everything load() treats as "this candidate is unreadable" — ZstdError
+# subclasses neither ValueError nor IOError, so a corrupt .zst file has
+# to be listed explicitly to degrade like corrupt JSON
+_LOAD_ERRORS = (ValueError, IOError) + (
+    (_zstd.ZstdError,) if _zstd is not None else ()
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_dir(path: str) -> None:
+    """fsync a directory so a completed rename survives power loss."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Not supported (e.g. Windows) — best effort
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Above this size, selective_load streams the file instead of building
+# the full object tree in memory
+_STREAM_THRESHOLD = 1 << 20
+
+
+def selective_load(path: str, keys) -> Optional[Dict[str, Any]]:
+    """
+    Load only the given top-level keys from a JSON object file.
+
+    For files above _STREAM_THRESHOLD, streams with ijson (when
+    installed) and stops reading as soon as every requested key has been
+    collected — a multi-MB session file with a large expertise tree is
+    never fully parsed if the caller only wants progress and learnings.
+    Falls back to a full parse otherwise. Returns None when the file is
+    missing or unparseable.
+    """
+    keys = frozenset(keys)
+    try:
+        # Open first, fstat the handle: one syscall fewer than a
+        # getsize probe followed by open, with no TOCTOU window
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= _STREAM_THRESHOLD:
+                try:
+                    import ijson
+                except ImportError:
+                    pass
+                else:
+                    collected = {}
+                    try:
+                        # use_float: Decimal would poison shared and
+                        # blow up the next save's serialization
+                        for key, value in ijson.kvitems(f, '', use_float=True):
+                            if key in keys:
+                                collected[key] = value
+                                if len(collected) == len(keys):
+                                    break
+                        return collected
+                    except (ijson.JSONError, ValueError):
+                        return None
+
+            data = jsonio.loads(f.read())
+        if not isinstance(data, dict):
+            return None
+        return {k: v for k, v in data.items() if k in keys}
+
+    except (ValueError, IOError, OSError):
+        return None
+
 
 class FileStore:
     """
@@ -39,24 +126,101 @@ class FileStore:
         session_id: str,
         auto_backup: bool = True,
         max_backups: int = 5,
+        pretty: bool = False,
+        compress: bool = False,
     ):
         self.base_path = base_path
         self.session_id = session_id
         self.auto_backup = auto_backup
         self.max_backups = max_backups
-        
-        self.file_path = os.path.join(base_path, f"{session_id}.json")
+        # Indented output roughly doubles bytes written; keep it as a
+        # debugging opt-in and write compact JSON in production
+        self.pretty = pretty
+        # Compression is opt-in and silently disabled when the
+        # zstandard package is not installed
+        self.compress = compress and _zstd is not None
+
+        self._plain_path = os.path.join(base_path, f"{session_id}.json")
+        if self.compress:
+            self.file_path = f"{self._plain_path}.zst"
+        else:
+            self.file_path = self._plain_path
         self.backup_dir = os.path.join(base_path, "backups")
+        # Sidecar for small field-level updates written by
+        # save_if_changed; load() folds it over the main file
+        self._delta_path = os.path.join(base_path, f"{session_id}.delta.json")
+        # Split-save sidecars: tiny progress file for status reads, and
+        # an append-only log for the high-churn delegation history
+        self._progress_sidecar = os.path.join(
+            base_path, f"{session_id}.progress.json"
+        )
+        self._history_path = os.path.join(
+            base_path, f"{session_id}.history.jsonl"
+        )
+        # Number of history entries already on disk (appends skip them)
+        self._history_len = 0
+        # Content digest of the last save (excluding _store_metadata),
+        # used to skip the write+backup when nothing actually changed
+        self._last_content_hash: Optional[bytes] = None
+        # Per-field-subset digests for save_if_changed
+        self._last_field_hashes: Dict[frozenset, bytes] = {}
     
     def load(self) -> Dict[str, Any]:
         """Load shared store from file, or return empty dict."""
-        if os.path.exists(self.file_path):
+        # Prefer the compressed file when present, but always fall back
+        # to plaintext so stores written before compression was enabled
+        # (or with zstandard uninstalled) keep loading
+        candidates = (
+            (f"{self._plain_path}.zst", self._plain_path)
+            if _zstd is not None
+            else (self._plain_path,)
+        )
+        for path in candidates:
             try:
-                with open(self.file_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Could not load {self.file_path}: {e}")
-        
+                with open(path, 'rb') as f:
+                    data = f.read()
+                if path.endswith('.zst'):
+                    data = _zstd.ZstdDecompressor().decompress(data)
+                shared = jsonio.loads(data)
+            except FileNotFoundError:
+                # Missing candidate — open() itself is the existence
+                # check, saving the former stat-then-open pair
+                continue
+            except _LOAD_ERRORS as e:
+                # Lazy %s formatting: no string is built when the level
+                # is disabled, and no stdout lock is taken under threads
+                logger.warning("Could not load %s: %s", path, e)
+                continue
+
+            # Fold in any field-level updates from save_if_changed that
+            # landed after the last full save
+            try:
+                with open(self._delta_path, 'rb') as f:
+                    shared.update(jsonio.loads(f.read()))
+            except (ValueError, IOError):
+                pass
+
+            # Rebuild delegation history from the append-only log when
+            # the blob was written by save_split
+            try:
+                with open(self._history_path, 'rb') as f:
+                    history = [
+                        jsonio.loads(line) for line in f if line.strip()
+                    ]
+                if history:
+                    shared["delegation_history"] = history
+                self._history_len = len(history)
+            except (ValueError, IOError):
+                pass
+
+            # _counts is derived data refreshed at save time; drop it on
+            # load so a stale copy from disk never circulates through
+            # live state
+            progress = shared.get("progress")
+            if isinstance(progress, dict):
+                progress.pop("_counts", None)
+            return shared
+
         return {}
     
     def save(self, shared: Dict[str, Any]) -> bool:
@@ -68,40 +232,206 @@ class FileStore:
         try:
             # Ensure directory exists
             os.makedirs(self.base_path, exist_ok=True)
-            
+
+            # Store the answer, not just the raw data: status readers
+            # only want the two task counts, so persist them as ints and
+            # a reader never has to size the full arrays
+            progress = shared.get("progress")
+            if isinstance(progress, dict):
+                progress["_counts"] = {
+                    "completed": len(progress.get("completed", [])),
+                    "tasks": len(progress.get("tasks", [])),
+                }
+
+            # Hash the content excluding the volatile metadata block; if
+            # it matches the last save, only saved_at would change — skip
+            # the backup and the write entirely
+            content_hash = None
+            try:
+                content_hash = hashlib.blake2b(
+                    jsonio.dumps(
+                        {k: v for k, v in shared.items() if k != "_store_metadata"},
+                        default=self._json_serializer,
+                    ).encode('utf-8'),
+                    digest_size=16,
+                ).digest()
+            except (TypeError, ValueError):
+                pass
+
+            if (
+                content_hash is not None
+                and content_hash == self._last_content_hash
+                and os.path.exists(self.file_path)
+            ):
+                return True
+
             # Create backup if file exists and auto_backup enabled
             if self.auto_backup and os.path.exists(self.file_path):
                 self._create_backup()
-            
+
             # Add metadata
             shared["_store_metadata"] = {
                 "saved_at": datetime.now().isoformat(),
                 "session_id": self.session_id,
             }
             
-            # Write with custom serializer
-            with open(self.file_path, 'w') as f:
-                json.dump(shared, f, indent=2, default=self._json_serializer)
-            
+            # Write with custom serializer, atomically: serialize to a
+            # sibling temp file, fsync, then rename into place so a crash
+            # mid-write can't corrupt the session file
+            data = jsonio.dumps(
+                shared,
+                indent=2 if self.pretty else None,
+                default=self._json_serializer,
+            ).encode('utf-8')
+            if self.compress:
+                data = _zstd.ZstdCompressor(level=3).compress(data)
+            tmp_path = f"{self.file_path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+            _fsync_dir(self.base_path)
+            # Full save supersedes any pending field-level sidecar
+            try:
+                os.remove(self._delta_path)
+            except OSError:
+                pass
+            if self.compress:
+                # Migration: drop a stale plaintext copy so load() can't
+                # resurrect outdated state
+                try:
+                    os.remove(self._plain_path)
+                except OSError:
+                    pass
+            self._last_content_hash = content_hash
+
             return True
-            
+
         except IOError as e:
-            print(f"Error saving store: {e}")
+            logger.error("Error saving store: %s", e)
             return False
     
+    def save_split(self, shared: Dict[str, Any]) -> bool:
+        """
+        Save with high-churn data split out of the main blob.
+
+        New delegation_history entries are appended to an
+        {session_id}.history.jsonl log instead of being rewritten inside
+        the blob on every save, and the progress section is mirrored to
+        a tiny {session_id}.progress.json so status reads never have to
+        open the full session file. load() reassembles the history.
+
+        Returns True on success, False on failure.
+        """
+        history = shared.get("delegation_history")
+        blob = shared
+        if history is not None:
+            try:
+                new_entries = history[self._history_len:]
+                if new_entries:
+                    os.makedirs(self.base_path, exist_ok=True)
+                    with open(self._history_path, 'a') as f:
+                        f.writelines(
+                            jsonio.dumps(entry, default=self._json_serializer)
+                            + "\n"
+                            for entry in new_entries
+                        )
+                    self._history_len = len(history)
+                blob = {
+                    k: v for k, v in shared.items()
+                    if k != "delegation_history"
+                }
+            except (TypeError, ValueError, IOError) as e:
+                # Couldn't externalize — keep history in the blob
+                logger.warning("Could not append history log: %s", e)
+
+        saved = self.save(blob)
+
+        # Mirror progress to the small sidecar for cheap status reads
+        try:
+            payload = jsonio.dumps(
+                shared.get("progress", {}), default=self._json_serializer
+            )
+            tmp_path = f"{self._progress_sidecar}.tmp.{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._progress_sidecar)
+        except (TypeError, ValueError, IOError):
+            pass
+
+        return saved
+
+    def save_if_changed(
+        self,
+        shared: Dict[str, Any],
+        fields: Optional[set] = None,
+    ) -> bool:
+        """
+        Save only when the fields of interest changed.
+
+        For a small field subset (e.g. {"last_checkpoint"}), the changed
+        slice is written to a sidecar delta file without the backup and
+        full-serialization machinery — load() folds the sidecar over the
+        main file. With fields=None this delegates to save(), which
+        already no-ops on identical content.
+
+        Returns True on success or no-op, False on failure.
+        """
+        if not fields:
+            return self.save(shared)
+
+        subset = {k: shared.get(k) for k in fields}
+        try:
+            payload = jsonio.dumps(subset, default=self._json_serializer)
+        except (TypeError, ValueError):
+            return self.save(shared)
+
+        key = frozenset(fields)
+        digest = hashlib.blake2b(
+            payload.encode('utf-8'), digest_size=16
+        ).digest()
+        if digest == self._last_field_hashes.get(key):
+            return True
+
+        try:
+            os.makedirs(self.base_path, exist_ok=True)
+            # Merge over any pending delta for other field subsets
+            try:
+                with open(self._delta_path, 'rb') as f:
+                    merged = jsonio.loads(f.read())
+            except (ValueError, IOError):
+                merged = {}
+            merged.update(subset)
+            tmp_path = f"{self._delta_path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                f.write(jsonio.dumps(merged, default=self._json_serializer))
+            os.replace(tmp_path, self._delta_path)
+            self._last_field_hashes[key] = digest
+            return True
+        except (TypeError, ValueError, IOError) as e:
+            logger.error("Error writing delta: %s", e)
+            return False
+
     def _create_backup(self) -> None:
         """Create a timestamped backup of current file."""
         try:
             os.makedirs(self.backup_dir, exist_ok=True)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"{self.session_id}_{timestamp}.json"
+            # time.strftime avoids building a datetime object
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            suffix = ".json.zst" if self.compress else ".json"
+            backup_name = f"{self.session_id}_{timestamp}{suffix}"
             backup_path = os.path.join(self.backup_dir, backup_name)
             
-            # Copy current file to backup
-            with open(self.file_path, 'r') as src:
-                with open(backup_path, 'w') as dst:
-                    dst.write(src.read())
+            # Hard-link the current file as the backup — O(1), no copy
+            # through userspace. The subsequent save replaces file_path
+            # with a new inode, so the backup keeps the old content.
+            try:
+                os.link(self.file_path, backup_path)
+            except OSError:
+                # Cross-filesystem or unsupported: fall back to a copy
+                shutil.copyfile(self.file_path, backup_path)
             
             # Cleanup old backups
             self._cleanup_backups()
@@ -112,22 +442,25 @@ class FileStore:
     def _cleanup_backups(self) -> None:
         """Remove old backups beyond max_backups limit."""
         try:
-            backups = []
             prefix = f"{self.session_id}_"
-            
-            for f in os.listdir(self.backup_dir):
-                if f.startswith(prefix) and f.endswith('.json'):
-                    full_path = os.path.join(self.backup_dir, f)
-                    backups.append((os.path.getmtime(full_path), full_path))
-            
-            # Sort by modification time (oldest first)
-            backups.sort()
-            
-            # Remove oldest backups
-            while len(backups) > self.max_backups:
-                _, path = backups.pop(0)
-                os.remove(path)
-                
+
+            # One scandir pass; DirEntry.stat() reuses the cached stat
+            # instead of paying a fresh syscall per entry
+            with os.scandir(self.backup_dir) as entries:
+                backups = [
+                    (entry.stat().st_mtime, entry.path)
+                    for entry in entries
+                    if entry.name.startswith(prefix)
+                    and entry.name.endswith(('.json', '.json.zst'))
+                ]
+
+            # Remove only the oldest beyond the limit — a partial
+            # selection, not a full sort
+            excess = len(backups) - self.max_backups
+            if excess > 0:
+                for _, path in heapq.nsmallest(excess, backups):
+                    os.remove(path)
+
         except IOError:
             pass
     
@@ -135,6 +468,11 @@ class FileStore:
         """Custom JSON serializer for non-standard types."""
         if hasattr(obj, 'isoformat'):
             return obj.isoformat()
+        if isinstance(obj, Mapping):
+            # Materialize dict-like views (e.g. the lazy spec-file map)
+            # as their items — the __dict__ branch below would persist
+            # their internal attributes instead of their contents
+            return dict(obj)
         if hasattr(obj, '__dict__'):
             return obj.__dict__
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
@@ -148,51 +486,65 @@ class FileStore:
         try:
             os.makedirs(self.backup_dir, exist_ok=True)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             label_part = f"_{label}" if label else ""
             checkpoint_name = f"{self.session_id}_checkpoint{label_part}_{timestamp}.json"
             checkpoint_path = os.path.join(self.backup_dir, checkpoint_name)
             
-            with open(checkpoint_path, 'w') as f:
-                json.dump(shared, f, indent=2, default=self._json_serializer)
-            
+            # Same atomic pattern as save: temp file, fsync, rename
+            data = jsonio.dumps(
+                shared,
+                indent=2 if self.pretty else None,
+                default=self._json_serializer,
+            )
+            tmp_path = f"{checkpoint_path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, checkpoint_path)
+            _fsync_dir(self.backup_dir)
+
             return True
             
         except IOError as e:
-            print(f"Error creating checkpoint: {e}")
+            logger.error("Error creating checkpoint: %s", e)
             return False
     
     def list_checkpoints(self) -> list:
         """List all checkpoints for this session."""
         checkpoints = []
-        
-        if os.path.exists(self.backup_dir):
-            prefix = f"{self.session_id}_checkpoint"
-            
-            for f in os.listdir(self.backup_dir):
-                if f.startswith(prefix) and f.endswith('.json'):
-                    full_path = os.path.join(self.backup_dir, f)
+        prefix = f"{self.session_id}_checkpoint"
+
+        try:
+            entries = os.scandir(self.backup_dir)
+        except FileNotFoundError:
+            return []
+        with entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.name.endswith('.json'):
                     checkpoints.append({
-                        "name": f,
-                        "path": full_path,
+                        "name": entry.name,
+                        "path": entry.path,
                         "modified": datetime.fromtimestamp(
-                            os.path.getmtime(full_path)
+                            entry.stat().st_mtime
                         ).isoformat(),
                     })
-        
+
         return sorted(checkpoints, key=lambda x: x["modified"], reverse=True)
     
     def load_checkpoint(self, checkpoint_name: str) -> Optional[Dict[str, Any]]:
         """Load a specific checkpoint."""
         checkpoint_path = os.path.join(self.backup_dir, checkpoint_name)
-        
-        if os.path.exists(checkpoint_path):
-            try:
-                with open(checkpoint_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-        
+
+        # FileNotFoundError is an IOError, so open() doubles as the
+        # existence check
+        try:
+            with open(checkpoint_path, 'r') as f:
+                return jsonio.loads(f.read())
+        except (ValueError, IOError):
+            pass
+
         return None
 
 
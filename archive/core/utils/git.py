@@ -4,16 +4,57 @@ Git Utilities
 Helper functions for git operations in Agent OS workflows.
 """
 
+import os
 import subprocess
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
+# Bumped whenever this process mutates the repo (stage_and_commit) so
+# memoized results from before the mutation are never served
+_cache_epoch = 0
+
+
+def _git_cache_key(cwd: Optional[str]) -> Optional[tuple]:
+    """
+    Build a memoization key that changes whenever the repo does.
+
+    Keys on the mtimes of .git/HEAD and .git/index plus the in-process
+    epoch. Returns None when cwd is not a git repo root, in which case
+    callers should skip the cache.
+    """
+    git_dir = os.path.join(cwd or os.getcwd(), ".git")
+    try:
+        head_mtime = os.stat(os.path.join(git_dir, "HEAD")).st_mtime_ns
+    except OSError:
+        return None
+    try:
+        index_mtime = os.stat(os.path.join(git_dir, "index")).st_mtime_ns
+    except OSError:
+        index_mtime = 0
+    return (cwd, head_mtime, index_mtime, _cache_epoch)
+
 
 def get_git_status(cwd: str = None) -> Optional[str]:
     """
     Get git status (porcelain format).
-    
+
+    Memoized on the repo's HEAD/index mtimes, so repeated polls within
+    one flow collapse to a single subprocess.
+
     Returns None if not a git repo or on error.
     """
+    key = _git_cache_key(cwd)
+    if key is None:
+        return _git_status_uncached(cwd)
+    return _git_status_cached(key)
+
+
+@lru_cache(maxsize=64)
+def _git_status_cached(key: tuple) -> Optional[str]:
+    return _git_status_uncached(key[0])
+
+
+def _git_status_uncached(cwd: Optional[str]) -> Optional[str]:
     try:
         result = subprocess.run(
             ["git", "status", "--porcelain"],
@@ -65,9 +106,24 @@ def get_recent_commits(
 def get_current_branch(cwd: str = None) -> Optional[str]:
     """
     Get current git branch name.
-    
+
+    Memoized like get_git_status — the branch can only change when
+    .git/HEAD does.
+
     Returns None if not a git repo or on error.
     """
+    key = _git_cache_key(cwd)
+    if key is None:
+        return _current_branch_uncached(cwd)
+    return _current_branch_cached(key)
+
+
+@lru_cache(maxsize=64)
+def _current_branch_cached(key: tuple) -> Optional[str]:
+    return _current_branch_uncached(key[0])
+
+
+def _current_branch_uncached(cwd: Optional[str]) -> Optional[str]:
     try:
         result = subprocess.run(
             ["git", "rev-parse", "--abbrev-ref", "HEAD"],
@@ -76,7 +132,7 @@ def get_current_branch(cwd: str = None) -> Optional[str]:
             text=True,
             timeout=10,
         )
-        
+
         if result.returncode == 0:
             return result.stdout.strip()
         return None
@@ -132,10 +188,14 @@ def stage_and_commit(
             timeout=30,
         )
         
+        # The repo changed under us — invalidate memoized status/branch
+        global _cache_epoch
+        _cache_epoch += 1
+
         if commit_result.returncode == 0:
             return True, commit_result.stdout.strip()
         return False, f"Commit failed: {commit_result.stderr}"
-        
+
     except subprocess.TimeoutExpired:
         return False, "Git operation timed out"
     except FileNotFoundError:
@@ -0,0 +1,63 @@
+"""
+JSON Codec Shim
+
+Selects the fastest available JSON backend at import time:
+orjson (C, fastest) -> ujson (C) -> stdlib json (always available).
+
+Session state and progress files can grow to multiple megabytes over
+long sessions, so decode/encode speed matters on the session start and
+checkpoint paths. The on-disk format stays plain JSON regardless of
+which backend is active.
+
+Usage:
+    from utils import jsonio
+
+    data = jsonio.loads(f.read())
+    f.write(jsonio.dumps(data, indent=2))
+"""
+
+import json as _stdlib_json
+
+try:
+    import orjson as _orjson
+
+    def loads(data):
+        """Parse JSON from a str or bytes buffer."""
+        return _orjson.loads(data)
+
+    def dumps(obj, indent=None, default=None):
+        """Serialize obj to a JSON string (indent of 2 when requested)."""
+        option = _orjson.OPT_INDENT_2 if indent else 0
+        return _orjson.dumps(obj, option=option, default=default).decode("utf-8")
+
+    BACKEND = "orjson"
+
+except ImportError:
+    try:
+        import ujson as _ujson
+
+        def loads(data):
+            """Parse JSON from a str or bytes buffer."""
+            return _ujson.loads(data)
+
+        def dumps(obj, indent=None, default=None):
+            """Serialize obj to a JSON string."""
+            if default is not None:
+                # ujson's default support is inconsistent across versions;
+                # fall back to stdlib for custom serializers
+                return _stdlib_json.dumps(obj, indent=indent, default=default)
+            return _ujson.dumps(obj, indent=indent or 0)
+
+        BACKEND = "ujson"
+
+    except ImportError:
+
+        def loads(data):
+            """Parse JSON from a str or bytes buffer."""
+            return _stdlib_json.loads(data)
+
+        def dumps(obj, indent=None, default=None):
+            """Serialize obj to a JSON string."""
+            return _stdlib_json.dumps(obj, indent=indent, default=default)
+
+        BACKEND = "json"
@@ -11,39 +11,38 @@ Usage:
 """
 
 import os
+import re
 import sys
+import mmap
+import time
+import heapq
 import argparse
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add core to path
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CORE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "core")
 sys.path.insert(0, CORE_DIR)
 
-from pocketflow import Flow
-from flows import (
-    ImplementationFlow,
-    SpecificationFlow,
-    BootstrapFlow,
-    create_implementation_flow,
-    create_bootstrap_flow,
-)
-from store import FileStore
+# The workflow engine (flows, nodes, store) is imported inside the
+# handlers that need it — `status` and `--help` shouldn't pay for it
+from utils import jsonio
 
 
 def run_bootstrap(args):
     """Run the bootstrap flow to initialize expertise."""
     print(f"🚀 Bootstrapping expertise for: {args.project}")
     print("-" * 50)
-    
+
+    from flows import BootstrapFlow
+
     flow = BootstrapFlow()
     shared = {
-        "project_root": os.path.abspath(args.project),
+        "project_root": args.project,
     }
-    
+
     flow.run(shared)
-    
+
     # Report results
     print("\n✅ Bootstrap complete!")
     print(f"   Project structure analyzed")
@@ -64,7 +63,10 @@ def run_implementation(args):
     print(f"   Spec: {args.spec}")
     print(f"   Mode: {args.mode}")
     print("-" * 50)
-    
+
+    from flows import create_implementation_flow
+    from store import FileStore
+
     # Create flow with options
     flow = create_implementation_flow(
         delegation_mode=args.mode,
@@ -73,52 +75,94 @@ def run_implementation(args):
     )
     
     # Initialize shared store
-    project_root = os.path.abspath(args.project)
-    session_id = args.session or f"impl_{int(datetime.now().timestamp())}"
-    
-    # Try to load existing session
-    store = FileStore(
-        os.path.join(project_root, "agent-os/sessions"),
-        session_id
-    )
-    shared = store.load()
-    
-    # Set up initial state
-    shared.update({
-        "project_root": project_root,
-        "spec_name": args.spec,
-        "session_id": session_id,
-        "delegation_mode": args.mode,
-    })
-    
+    project_root = args.project
+    # time_ns: cheaper than a datetime round-trip, and two invocations
+    # in the same second can no longer collide on the same id
+    session_id = args.session or f"impl_{time.time_ns()}"
+
+    sessions_dir = os.path.join(project_root, "agent-os/sessions")
+
+    # Advisory lock on the session id: without it, two concurrent
+    # `implement` runs on the same session both load, mutate and save,
+    # and the loser's work is silently overwritten. fcntl is
+    # POSIX-only; elsewhere we proceed unguarded as before.
     try:
-        # Run the flow
-        flow.run(shared)
-        
-        # Save final state
-        store.save(shared)
-        
-        # Report results
-        print("\n" + "=" * 50)
-        print("📊 Session Summary")
-        print("=" * 50)
-        print(f"   Session ID: {session_id}")
-        print(f"   Status: {shared.get('session_summary', 'Completed')}")
-        
-        progress = shared.get("progress", {})
-        completed = len(progress.get("completed", []))
-        total = len(progress.get("tasks", []))
-        print(f"   Tasks: {completed}/{total} completed")
-        
-        if shared.get("delegation_history"):
-            print(f"   Delegations: {len(shared['delegation_history'])}")
-        
-    except KeyboardInterrupt:
-        print("\n\n⚠️  Interrupted! Saving state...")
-        store.save(shared)
-        print(f"   Session saved: {session_id}")
-        print("   Resume with: --session", session_id)
-    
+        import fcntl
+    except ImportError:
+        fcntl = None
+    lock_fd = None
+    if fcntl is not None:
+        os.makedirs(sessions_dir, exist_ok=True)
+        lock_fd = os.open(
+            os.path.join(sessions_dir, f"{session_id}.lock"),
+            os.O_CREAT | os.O_RDWR,
+            0o644,
+        )
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            print(f"⚠️  Session {session_id} is busy "
+                  "(another implement run holds its lock)")
+            sys.exit(1)
+
+    try:
+        # Resume an existing session only when one was asked for — a
+        # freshly minted impl_<ts> id cannot exist on disk, so probing
+        # for it would be wasted syscalls
+        store = FileStore(sessions_dir, session_id)
+        shared = store.load() if args.session else {}
+
+        # Set up initial state
+        shared.update({
+            "project_root": project_root,
+            "spec_name": args.spec,
+            "session_id": session_id,
+            "delegation_mode": args.mode,
+        })
+
+        try:
+            # Run the flow
+            flow.run(shared)
+
+            # Save final state — split form keeps the blob small and
+            # lets status reads touch only the progress sidecar
+            store.save_split(shared)
+            _update_index(
+                project_root, "sessions", session_id,
+                shared.get("progress", {})
+            )
+
+            # Report results
+            print("\n" + "=" * 50)
+            print("📊 Session Summary")
+            print("=" * 50)
+            print(f"   Session ID: {session_id}")
+            print(f"   Status: {shared.get('session_summary', 'Completed')}")
+
+            progress = shared.get("progress", {})
+            completed = len(progress.get("completed", []))
+            total = len(progress.get("tasks", []))
+            print(f"   Tasks: {completed}/{total} completed")
+
+            if shared.get("delegation_history"):
+                print(f"   Delegations: {len(shared['delegation_history'])}")
+
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Interrupted! Saving state...")
+            store.save_split(shared)
+            _update_index(
+                project_root, "sessions", session_id,
+                shared.get("progress", {})
+            )
+            print(f"   Session saved: {session_id}")
+            print("   Resume with: --session", session_id)
+    finally:
+        if lock_fd is not None:
+            # close() drops the flock; the .lock file itself stays —
+            # removing it would race a third run's open()
+            os.close(lock_fd)
+
     return shared
 
 
@@ -126,10 +170,12 @@ def run_spec(args):
     """Run the specification creation workflow."""
     print(f"📝 Creating specification: {args.name}")
     print("-" * 50)
-    
+
+    from flows import SpecificationFlow
+
     flow = SpecificationFlow()
     shared = {
-        "project_root": os.path.abspath(args.project),
+        "project_root": args.project,
         "spec_name": args.name,
         "requirements": args.requirements,
     }
@@ -138,6 +184,10 @@ def run_spec(args):
     
     # Report results
     if shared.get("spec_saved"):
+        _update_index(
+            args.project, "specs", args.name,
+            {"tasks": shared.get("tasks", []), "completed": []},
+        )
         print("\n✅ Specification created!")
         print(f"   Path: {shared.get('spec_path')}")
         print(f"   Tasks: {len(shared.get('tasks', []))}")
@@ -150,71 +200,286 @@ def run_spec(args):
     return shared
 
 
+# Above this size, task counts are streamed out of the file instead of
+# materializing the whole object graph (delegation history, transcripts)
+_COUNT_STREAM_THRESHOLD = 1 << 20
+
+# Session files match impl_*/session_*/bootstrap_*/spec_* .json, but not
+# utility files (pending_delegations.json) or the .progress/.delta
+# sidecars. One anchored C-level match per name replaces the chained
+# startswith/endswith checks.
+_SESSION_FILE_RE = re.compile(
+    r'(?:impl_|session_|bootstrap_|spec_)'
+    r'(?!.*\.(?:progress|delta)\.json$).+\.json$'
+).match
+
+# Above this size, hand the codec a read-only memory map instead of
+# copying the file through a bytes object; below it, mmap setup
+# overhead dominates
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _load_index(project_root):
+    """Read agent-os/index.json, returning {} when absent or corrupt."""
+    try:
+        with open(os.path.join(project_root, "agent-os/index.json"), 'rb') as f:
+            idx = jsonio.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return idx if isinstance(idx, dict) else {}
+
+
+def _update_index(project_root, kind, name, progress):
+    """
+    Fold one entry's task counts into agent-os/index.json.
+
+    The index is a write-time summary — {kind: {name: {completed,
+    tasks, mtime}}} with kind "sessions" or "specs" — so `status` can
+    answer from one small file instead of re-reading every blob. The
+    rewrite is atomic (tmp + rename) and best-effort: an unwritable
+    index degrades status back to per-file reads, it never fails a
+    save.
+    """
+    idx = _load_index(project_root)
+    idx.setdefault(kind, {})[name] = {
+        "completed": len(progress.get("completed", [])),
+        "tasks": len(progress.get("tasks", [])),
+        "mtime": time.time(),
+    }
+    index_path = os.path.join(project_root, "agent-os/index.json")
+    tmp_path = f"{index_path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(jsonio.dumps(idx))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _parse_json_fileobj(f, size):
+    """
+    Parse JSON from an open binary file, memory-mapping large ones.
+
+    Large files are mapped read-only and passed to the codec as a
+    buffer — no user-space read copy. Only the orjson backend accepts a
+    buffer, so other backends always take the plain read path.
+    """
+    if size >= _MMAP_THRESHOLD and jsonio.BACKEND == "orjson":
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return jsonio.loads(view)
+            finally:
+                view.release()
+    return jsonio.loads(f.read())
+
+
+def _load_json_file(path):
+    """Parse a JSON file via _parse_json_fileobj."""
+    with open(path, 'rb') as f:
+        return _parse_json_fileobj(f, os.fstat(f.fileno()).st_size)
+
+
+def _progress_counts(path, nested=False):
+    """
+    Return (completed, total) task counts from a JSON file.
+
+    nested=True reads session files, where the counts live under the
+    top-level "progress" key; nested=False reads a spec progress.json
+    directly. Files above _COUNT_STREAM_THRESHOLD are streamed with
+    ijson (when installed) so a multi-MB session blob is never built in
+    memory just to take two lengths. Raises OSError/ValueError for
+    missing or unparseable files — callers render those cases.
+    """
+    base = 'progress.' if nested else ''
+    # Open first and fstat the handle — one syscall fewer than a
+    # getsize probe followed by open, and no window for the file to
+    # vanish in between
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= _COUNT_STREAM_THRESHOLD:
+            try:
+                import ijson
+            except ImportError:
+                ijson = None
+            if ijson is not None:
+                completed_prefix = f'{base}completed.item'
+                tasks_prefix = f'{base}tasks.item'
+                counted = ('start_map', 'start_array', 'string', 'number',
+                           'boolean', 'null')
+                completed = total = 0
+                for prefix, event, _ in ijson.parse(f):
+                    if event in counted:
+                        if prefix == completed_prefix:
+                            completed += 1
+                        elif prefix == tasks_prefix:
+                            total += 1
+                return completed, total
+
+        data = _parse_json_fileobj(f, size)
+    if nested:
+        data = data.get("progress", {})
+    # Prefer the integer counts FileStore.save bakes in — older files
+    # without them fall back to sizing the arrays
+    counts = data.get("_counts")
+    if counts is not None:
+        try:
+            return counts["completed"], counts["tasks"]
+        except (KeyError, TypeError):
+            pass
+    return len(data.get("completed", [])), len(data.get("tasks", []))
+
+
+def _session_status_line(item):
+    """Render one session's status line (runs on a pool worker)."""
+    session_file, session_path, idx_entry = item
+    if idx_entry is not None:
+        # Trust the write-time index only while it is at least as new
+        # as the blob — one stat instead of an open + parse
+        try:
+            if idx_entry["mtime"] >= os.stat(session_path).st_mtime:
+                return (f"   {session_file[:-5]}: "
+                        f"{idx_entry['completed']}/{idx_entry['tasks']} tasks")
+        except (OSError, KeyError, TypeError):
+            pass
+    try:
+        # Prefer the tiny progress sidecar written by save_split — but
+        # only while it is at least as new as the blob. The session
+        # nodes update the blob directly, so after an interrupted run
+        # the sidecar lags behind and the blob is the truth.
+        sidecar = f"{session_path[:-5]}.progress.json"
+        try:
+            if os.stat(sidecar).st_mtime >= os.stat(session_path).st_mtime:
+                completed, total = _progress_counts(sidecar)
+                return f"   {session_file[:-5]}: {completed}/{total} tasks"
+        except (OSError, ValueError):
+            pass
+        completed, total = _progress_counts(session_path, nested=True)
+        return f"   {session_file[:-5]}: {completed}/{total} tasks"
+    except (OSError, ValueError) as e:
+        # ValueError covers both stdlib and orjson JSONDecodeError.
+        # Anything else (KeyboardInterrupt, MemoryError) propagates
+        # instead of being silently eaten
+        return f"   {session_file}: (unable to read: {e})"
+
+
+def _spec_status_line(item):
+    """Render one spec's status line (runs on a pool worker)."""
+    spec, progress_path, idx_entry = item
+    if idx_entry is not None:
+        try:
+            if idx_entry["mtime"] >= os.stat(progress_path).st_mtime:
+                return (f"   {spec}: "
+                        f"{idx_entry['completed']}/{idx_entry['tasks']} tasks")
+        except (OSError, KeyError, TypeError):
+            pass
+    try:
+        completed, total = _progress_counts(progress_path)
+    except FileNotFoundError:
+        return f"   {spec}: (no progress file)"
+    except (OSError, ValueError) as e:
+        return f"   {spec}: (unable to read progress: {e})"
+    return f"   {spec}: {completed}/{total} tasks"
+
+
+def _map_status_lines(worker, items):
+    """
+    Run a status-line worker over items, fanning out on a thread pool
+    when there are enough files for overlapped reads to pay off (the
+    GIL is released during read()).
+    """
+    if len(items) > 2:
+        with ThreadPoolExecutor(max_workers=min(8, len(items))) as pool:
+            return list(pool.map(worker, items))
+    return [worker(item) for item in items]
+
+
 def run_status(args):
     """Show current session/progress status."""
-    project_root = os.path.abspath(args.project)
+    project_root = args.project
     sessions_dir = os.path.join(project_root, "agent-os/sessions")
-    
-    print(f"📊 Status for: {project_root}")
-    print("-" * 50)
-    
+
+    # Accumulate the report and emit it in a single write at the end —
+    # one syscall instead of one per print()
+    out = [f"📊 Status for: {project_root}\n", "-" * 50 + "\n"]
+
+    # Write-time index: entries here answer status with a stat instead
+    # of a full read of each session/spec file
+    idx = _load_index(project_root)
+    idx_sessions = idx.get("sessions", {})
+    idx_specs = idx.get("specs", {})
+
     # List sessions
-    # Session files match patterns: impl_*, session_*, bootstrap_*
-    # Exclude utility files like pending_delegations.json
-    SESSION_PREFIXES = ('impl_', 'session_', 'bootstrap_', 'spec_')
-    
-    if os.path.exists(sessions_dir):
-        sessions = [
-            f for f in os.listdir(sessions_dir) 
-            if f.endswith('.json') and any(f.startswith(p) for p in SESSION_PREFIXES)
-        ]
+    # One scandir pass instead of exists + listdir + per-entry joins
+    try:
+        with os.scandir(sessions_dir) as it:
+            sessions = [e.name for e in it if _SESSION_FILE_RE(e.name)]
+    except FileNotFoundError:
+        sessions = None
+
+    if sessions is not None:
         if sessions:
-            print(f"\nSessions ({len(sessions)}):")
-            for session_file in sorted(sessions)[-5:]:  # Last 5
-                session_path = os.path.join(sessions_dir, session_file)
-                try:
-                    with open(session_path) as f:
-                        data = json.load(f)
-                    
-                    session_id = session_file[:-5]
-                    progress = data.get("progress", {})
-                    completed = len(progress.get("completed", []))
-                    total = len(progress.get("tasks", []))
-                    
-                    print(f"   {session_id}: {completed}/{total} tasks")
-                except:
-                    print(f"   {session_file}: (unable to read)")
+            out.append(f"\nSessions ({len(sessions)}):\n")
+            # Last 5: bounded-heap selection instead of sorting the
+            # whole listing; the inner sort orders just those 5
+            items = [
+                # Direct concat: sessions_dir is already normalized, so
+                # skip os.path.join's per-call separator scan
+                (session_file,
+                 f"{sessions_dir}{os.sep}{session_file}",
+                 idx_sessions.get(session_file[:-5]))
+                for session_file in sorted(heapq.nlargest(5, sessions))
+            ]
+            out.extend(
+                line + "\n"
+                for line in _map_status_lines(_session_status_line, items)
+            )
         else:
-            print("\nNo sessions found.")
-    
+            out.append("\nNo sessions found.\n")
+
     # Check for specs
     specs_dir = os.path.join(project_root, "agent-os/specs")
-    if os.path.exists(specs_dir):
-        specs = [d for d in os.listdir(specs_dir) 
-                if os.path.isdir(os.path.join(specs_dir, d))]
-        if specs:
-            print(f"\nSpecs ({len(specs)}):")
-            for spec in sorted(specs):
-                progress_path = os.path.join(specs_dir, spec, "progress.json")
-                if os.path.exists(progress_path):
-                    try:
-                        with open(progress_path) as f:
-                            progress = json.load(f)
-                        completed = len(progress.get("completed", []))
-                        total = len(progress.get("tasks", []))
-                        print(f"   {spec}: {completed}/{total} tasks")
-                    except:
-                        print(f"   {spec}: (unable to read progress)")
-                else:
-                    print(f"   {spec}: (no progress file)")
-    
-    # Check expertise
+    try:
+        with os.scandir(specs_dir) as it:
+            # is_dir(follow_symlinks=False) reads the cached dirent type
+            # — no stat per entry
+            specs = [e.name for e in it if e.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        specs = []
+    if specs:
+        out.append(f"\nSpecs ({len(specs)}):\n")
+        items = [
+            (spec,
+             os.path.join(specs_dir, spec, "progress.json"),
+             idx_specs.get(spec))
+            for spec in sorted(specs)
+        ]
+        out.extend(
+            line + "\n"
+            for line in _map_status_lines(_spec_status_line, items)
+        )
+
+    # Check expertise — stream names straight into the output buffer
+    # instead of materializing a list and a joined string first
     expertise_dir = os.path.join(project_root, "agent-os/expertise")
-    if os.path.exists(expertise_dir):
-        domains = [f[:-5] for f in os.listdir(expertise_dir) 
-                  if f.endswith('.yaml') and not f.startswith('_')]
-        if domains:
-            print(f"\nExpertise domains: {', '.join(domains)}")
+    try:
+        with os.scandir(expertise_dir) as it:
+            first = True
+            for e in it:
+                name = e.name
+                if name.endswith('.yaml') and not name.startswith('_'):
+                    out.append("\nExpertise domains: " if first else ", ")
+                    out.append(name[:-5])
+                    first = False
+            if not first:
+                out.append("\n")
+    except FileNotFoundError:
+        pass
+
+    sys.stdout.writelines(out)
 
 
 def main():
@@ -242,13 +507,15 @@ Examples:
     # Bootstrap command
     bootstrap_parser = subparsers.add_parser("bootstrap", help="Initialize expertise")
     bootstrap_parser.add_argument("--project", "-p", required=True, help="Project root path")
-    
+    bootstrap_parser.set_defaults(func=run_bootstrap)
+
     # Spec command
     spec_parser = subparsers.add_parser("spec", help="Create specification")
     spec_parser.add_argument("--project", "-p", required=True, help="Project root path")
     spec_parser.add_argument("--name", "-n", required=True, help="Specification name")
     spec_parser.add_argument("--requirements", "-r", required=True, help="Requirements description")
-    
+    spec_parser.set_defaults(func=run_spec)
+
     # Implement command
     impl_parser = subparsers.add_parser("implement", help="Run implementation workflow")
     impl_parser.add_argument("--project", "-p", required=True, help="Project root path")
@@ -261,26 +528,25 @@ Examples:
                             help="Disable auto-checkpointing")
     impl_parser.add_argument("--no-improve", action="store_true",
                             help="Disable self-improvement")
-    
+    impl_parser.set_defaults(func=run_implementation)
+
     # Status command
     status_parser = subparsers.add_parser("status", help="Show status")
     status_parser.add_argument("--project", "-p", required=True, help="Project root path")
-    
+    status_parser.set_defaults(func=run_status)
+
     args = parser.parse_args()
-    
-    if not args.command:
+
+    # Each subparser binds its handler via set_defaults(func=...), so
+    # dispatch is one attribute lookup instead of a command-name chain
+    if not getattr(args, "func", None):
         parser.print_help()
         sys.exit(1)
-    
-    # Dispatch to appropriate handler
-    if args.command == "bootstrap":
-        run_bootstrap(args)
-    elif args.command == "spec":
-        run_spec(args)
-    elif args.command == "implement":
-        run_implementation(args)
-    elif args.command == "status":
-        run_status(args)
+
+    # Resolve the project path once — every handler takes it as-is
+    args.project = os.path.abspath(args.project)
+
+    args.func(args)
 
 
 if __name__ == "__main__":